@@ -0,0 +1,174 @@
+# app/compress.py
+"""
+Query-aware context compression between retrieval and build_prompt().
+
+Prompt evaluation on CPU scales with context length, so instead of passing
+every retrieved document through whole we:
+- split retrieved passages into sentences
+- score all sentences against the query embedding in one vectorized pass
+- keep the top sentences plus their neighbours until a character budget is hit
+
+The budget is a fraction of the retrieved text (keep_ratio), optionally capped
+by max_chars, so it binds however short the retrieved passages are.
+
+The encoder and the query embedding are shared with app.retrieval, so the
+query is encoded once per question. If sentence-transformers is unavailable,
+sentences are scored by keyword overlap with the query (same fallback idea as
+Retriever).
+"""
+
+import re
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.retrieval import get_encoder, encode_query
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    single = " ".join((text or "").split())
+    return [s for s in _SENT_SPLIT.split(single) if s]
+
+
+def _keyword_scores(query: str, sentences: List[str]) -> np.ndarray:
+    q_tokens = {tok for tok in re.findall(r"\w+", query.lower()) if len(tok) > 1}
+    if not q_tokens:
+        return np.zeros(len(sentences), dtype=np.float32)
+    scores = []
+    for s in sentences:
+        s_tokens = set(re.findall(r"\w+", s.lower()))
+        scores.append(len(q_tokens & s_tokens) / (len(s_tokens) + 1))
+    return np.asarray(scores, dtype=np.float32)
+
+
+def _score_sentences(
+    query: str,
+    sentences: List[str],
+    encoder: Optional[Any] = None,
+    query_emb: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    if encoder is None:
+        encoder = get_encoder()
+        if encoder is None:
+            return _keyword_scores(query, sentences)
+        if query_emb is None:
+            # cache hit when the Retriever already embedded this query
+            query_emb = encode_query(query)
+    if query_emb is None:
+        embs = encoder.encode([query] + sentences, convert_to_numpy=True)
+        query_emb, sent_embs = embs[0], embs[1:]
+    else:
+        # all sentences in a single batch
+        sent_embs = encoder.encode(sentences, convert_to_numpy=True)
+    sent_embs = sent_embs / (np.linalg.norm(sent_embs, axis=1, keepdims=True) + 1e-12)
+    return sent_embs @ (query_emb / (np.linalg.norm(query_emb) + 1e-12))
+
+
+def compress_context(
+    query: str,
+    retrieved_docs: List[Dict[str, Any]],
+    keep_ratio: float = 0.5,
+    max_chars: Optional[int] = None,
+    neighbours: int = 1,
+    encoder: Optional[Any] = None,
+    query_emb: Optional[np.ndarray] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Return (compressed_docs, stats).
+
+    compressed_docs keep the shape build_prompt() expects ({"source", "text"}),
+    with "text" reduced to the selected sentences in their original order.
+    Docs with no selected sentence are dropped; docs with empty text are kept
+    as-is so build_prompt() still renders them.
+
+    Arguments:
+      keep_ratio: character budget as a fraction of the retrieved text
+      max_chars: optional absolute cap on that budget
+      neighbours: sentences on each side of a top sentence to keep with it
+      encoder: optional object with .encode(list, convert_to_numpy=True)
+      query_emb: optional precomputed query embedding (same model as encoder)
+
+    stats: {"original_chars", "budget_chars", "compressed_chars", "ratio",
+            "sentences_kept", "sentences_total"}
+    """
+    # flatten to (doc index, sentence index) so scoring is one pass over everything
+    per_doc: List[List[str]] = []
+    flat: List[Tuple[int, int]] = []
+    sentences: List[str] = []
+    original_chars = 0
+    for di, d in enumerate(retrieved_docs):
+        sents = split_sentences(d.get("text") or "")
+        # measured the same way as compressed_chars so the ratio ignores whitespace
+        original_chars += len(" ".join(sents))
+        per_doc.append(sents)
+        for si, s in enumerate(sents):
+            flat.append((di, si))
+            sentences.append(s)
+
+    if not sentences:
+        stats = {"original_chars": original_chars, "budget_chars": 0, "compressed_chars": original_chars,
+                 "ratio": 1.0, "sentences_kept": 0, "sentences_total": 0}
+        return [{"source": d.get("source", "unknown.txt"), "text": ""} for d in retrieved_docs], stats
+
+    # measured in the same units as the per-sentence cost below (text + joining space)
+    budget = int(keep_ratio * sum(len(s) + 1 for s in sentences))
+    if max_chars is not None:
+        budget = min(budget, max_chars)
+
+    scores = _score_sentences(query, sentences, encoder=encoder, query_emb=query_emb)
+    order = np.argsort(-scores, kind="stable")
+
+    selected = set()
+    used = 0
+    for idx in order:
+        di, si = flat[idx]
+        if (di, si) not in selected:
+            cost = len(per_doc[di][si]) + 1
+            if used + cost > budget:
+                # anchor doesn't fit: don't keep its neighbours without it
+                continue
+            selected.add((di, si))
+            used += cost
+        # then its neighbours within the same doc
+        window = [j for off in range(1, neighbours + 1) for j in (si - off, si + off)]
+        for j in window:
+            if j < 0 or j >= len(per_doc[di]) or (di, j) in selected:
+                continue
+            cost = len(per_doc[di][j]) + 1
+            if used + cost > budget:
+                continue
+            selected.add((di, j))
+            used += cost
+        if used >= budget:
+            break
+
+    # always keep at least the best sentence, even if it alone exceeds the budget
+    if not selected:
+        selected.add(flat[int(order[0])])
+
+    compressed = []
+    compressed_chars = 0
+    sentences_kept = 0
+    for di, d in enumerate(retrieved_docs):
+        if not per_doc[di]:
+            compressed.append({"source": d.get("source", "unknown.txt"), "text": ""})
+            continue
+        kept = [s for si, s in enumerate(per_doc[di]) if (di, si) in selected]
+        if not kept:
+            continue
+        text = " ".join(kept)
+        compressed_chars += len(text)
+        sentences_kept += len(kept)
+        compressed.append({"source": d.get("source", "unknown.txt"), "text": text})
+
+    stats = {
+        "original_chars": original_chars,
+        "budget_chars": budget,
+        "compressed_chars": compressed_chars,
+        "ratio": (compressed_chars / original_chars) if original_chars else 1.0,
+        "sentences_kept": sentences_kept,
+        "sentences_total": len(sentences),
+    }
+    return compressed, stats
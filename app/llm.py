@@ -142,6 +142,13 @@ class LLM:
 
         return (text or "").strip()
 
+    def reset(self) -> None:
+        """Drop llama-cpp's cached tokens so the next call can't reuse a KV prefix."""
+        with self._call_lock:
+            reset_fn = getattr(self.llm, "reset", None)
+            if callable(reset_fn):
+                reset_fn()
+
     def close(self) -> None:
         """Attempt to release native resources cleanly."""
         try:
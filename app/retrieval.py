@@ -1,5 +1,6 @@
 ﻿# app/retrieval.py
 import os, json, math, re
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import numpy as np
@@ -16,6 +17,33 @@ def _cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
     denom = (np.linalg.norm(a) * np.linalg.norm(b))
     return float(np.dot(a, b) / denom) if denom != 0 else 0.0
 
+_encoder = None
+_encoder_failed = False
+
+def get_encoder():
+    """
+    Shared SentenceTransformer, loaded once per process.
+    Returns None if sentence-transformers can't be loaded; the failure is
+    remembered so later calls don't retry the import/download.
+    """
+    global _encoder, _encoder_failed
+    if _encoder is None and not _encoder_failed:
+        try:
+            # lazy import to avoid heavy dependency when unused
+            from sentence_transformers import SentenceTransformer
+            _encoder = SentenceTransformer("all-MiniLM-L6-v2")
+        except Exception:
+            _encoder_failed = True
+    return _encoder
+
+@lru_cache(maxsize=32)
+def encode_query(query: str) -> Optional[np.ndarray]:
+    # cached so retrieval and context compression share one query encode
+    model = get_encoder()
+    if model is None:
+        return None
+    return model.encode(query, convert_to_numpy=True)
+
 class Retriever:
     """
     Retriever that uses precomputed embeddings (if available) and falls back to a
@@ -66,15 +94,11 @@ class Retriever:
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         # If we have embeddings + metadata, perform semantic search
         if self.embeddings is not None and self.metadata is not None:
-            try:
-                # lazy import to avoid heavy dependency when unused
-                from sentence_transformers import SentenceTransformer
-            except Exception:
+            q_emb = encode_query(query)
+            if q_emb is None:
                 # cannot compute query embedding, fallback to keyword
                 return self._keyword_retrieve(query, top_k)
 
-            model = SentenceTransformer("all-MiniLM-L6-v2")
-            q_emb = model.encode(query, convert_to_numpy=True)
             # compute cosine similarities
             sims = np.dot(self.embeddings, q_emb) / (np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(q_emb) + 1e-12)
             # get top_k indices
@@ -111,4 +135,4 @@ class Retriever:
         return self.retrieve(q, top_k=k)
 
     def refresh(self):
-        self._docs = self._load_docs_list()
+        self._docs = self._load_docs_list()
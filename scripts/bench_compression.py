@@ -0,0 +1,124 @@
+# scripts/bench_compression.py
+"""
+Benchmark query-aware context compression.
+
+For each question: retrieve, build the prompt with and without compression,
+and report prompt size, compression ratio and answer latency. The compressed
+latency includes the compression step itself.
+
+Run:
+  python -m scripts.bench_compression              # prompt sizes + LLM latency
+  python -m scripts.bench_compression --no-llm     # prompt sizes only
+"""
+
+import argparse
+import time
+
+from app.retrieval import Retriever
+from app.prompt import build_prompt
+from app.compress import compress_context
+
+QUESTIONS = [
+    "How do I reset my password?",
+    "What is the API rate limit?",
+    "The app crashes on start, what should I do?",
+    "How do I cancel my subscription?",
+    "Which browsers are supported?",
+    "How do I restore a backup?",
+]
+
+
+def _time_answer(llm, prompt: str, max_tokens: int) -> float:
+    # clear cached tokens so neither prompt reuses the other's KV prefix
+    llm.reset()
+    t0 = time.perf_counter()
+    llm.answer(
+        prompt=prompt,
+        max_tokens=max_tokens,
+        temperature=0.0,
+        top_p=0.5,
+        stop=["SOURCES:", "===END_ANSWER==="],
+    )
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--top-k", type=int, default=4)
+    ap.add_argument("--keep-ratio", type=float, default=0.5)
+    ap.add_argument("--max-chars", type=int, default=None)
+    ap.add_argument("--neighbours", type=int, default=1)
+    ap.add_argument("--max-tokens", type=int, default=80)
+    ap.add_argument("--no-llm", action="store_true", help="only report prompt sizes")
+    args = ap.parse_args()
+
+    retr = Retriever()
+    llm = None
+    if not args.no_llm:
+        from app.llm import LLM
+        llm = LLM(model_filename="phi-2.Q4_K_M.gguf", n_threads=2, n_ctx=1024, n_batch=128)
+
+    rows = []
+    try:
+        # untimed warm-up so model/encoder loading isn't charged to the first question
+        warm_docs = retr.retrieve(QUESTIONS[0], top_k=args.top_k)
+        compress_context(QUESTIONS[0], warm_docs, keep_ratio=args.keep_ratio, max_chars=args.max_chars, neighbours=args.neighbours)
+        if llm is not None:
+            _time_answer(llm, build_prompt("warm-up", retrieved_docs=warm_docs), args.max_tokens)
+
+        for i, q in enumerate(QUESTIONS):
+            docs = retr.retrieve(q, top_k=args.top_k)
+            t0 = time.perf_counter()
+            compressed, stats = compress_context(q, docs, keep_ratio=args.keep_ratio, max_chars=args.max_chars, neighbours=args.neighbours)
+            compress_s = time.perf_counter() - t0
+
+            full_prompt = build_prompt(q, retrieved_docs=docs)
+            small_prompt = build_prompt(q, retrieved_docs=compressed)
+
+            row = {
+                "q": q,
+                "ratio": stats["ratio"],
+                "full_len": len(full_prompt),
+                "small_len": len(small_prompt),
+                "compress_s": compress_s,
+                "full_s": None,
+                "small_s": None,
+            }
+            if llm is not None:
+                # alternate which prompt runs first to cancel out ordering effects
+                if i % 2 == 0:
+                    row["full_s"] = _time_answer(llm, full_prompt, args.max_tokens)
+                    row["small_s"] = _time_answer(llm, small_prompt, args.max_tokens)
+                else:
+                    row["small_s"] = _time_answer(llm, small_prompt, args.max_tokens)
+                    row["full_s"] = _time_answer(llm, full_prompt, args.max_tokens)
+            rows.append(row)
+    finally:
+        if llm is not None:
+            llm.close()
+
+    print(f"\n{'question':<45} {'ratio':>6} {'prompt':>13} {'compress':>9} {'latency':>15}")
+    for r in rows:
+        latency = "-"
+        if r["full_s"] is not None:
+            # compressed path is charged for the compression step too
+            latency = f"{r['full_s']:.1f}s -> {r['compress_s'] + r['small_s']:.1f}s"
+        print(
+            f"{r['q'][:45]:<45} {r['ratio']:>6.2f} "
+            f"{r['full_len']:>5} -> {r['small_len']:<5} {r['compress_s'] * 1000:>7.1f}ms {latency:>15}"
+        )
+
+    n = len(rows)
+    if n:
+        avg_ratio = sum(r["ratio"] for r in rows) / n
+        print(f"\nMean context compression ratio: {avg_ratio:.2f}")
+        if llm is not None:
+            full = sum(r["full_s"] for r in rows) / n
+            small = sum(r["small_s"] for r in rows) / n
+            comp = sum(r["compress_s"] for r in rows) / n
+            print(f"Mean answer latency: {full:.2f}s (full) vs {comp + small:.2f}s (compressed, incl. compression)")
+            print(f"  compressed breakdown: {comp:.3f}s compression + {small:.2f}s generation")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import time
 from app.llm import LLM
 from app.retrieval import Retriever
 from app.prompt import build_prompt
+from app.compress import compress_context
 
 def main():
     # tuned for responsiveness
@@ -16,9 +17,15 @@ def main():
                 continue
 
             docs = retr.retrieve(q, top_k=4)
-            prompt = build_prompt(q, retrieved_docs=docs)
+            context_docs, cstats = compress_context(q, docs, keep_ratio=0.5)
+            prompt = build_prompt(q, retrieved_docs=context_docs)
 
-            print(f"\nSelected sources: {', '.join(d.get('source') for d in docs)}\n")
+            print(f"\nSelected sources: {', '.join(d.get('source') for d in context_docs)}")
+            kept_sources = {d.get('source') for d in context_docs}
+            dropped = [d.get('source') for d in docs if d.get('source') not in kept_sources]
+            if dropped:
+                print(f"Dropped by compression: {', '.join(dropped)}")
+            print(f"Context compression: {cstats['original_chars']} -> {cstats['compressed_chars']} chars (ratio {cstats['ratio']:.2f})\n")
 
             t0 = time.time()
             ans = llm.answer(
@@ -59,8 +66,8 @@ def main():
 
             print("\n==== ANSWER (synthesized) ====\n")
             print((extracted or "I don't know based on the provided context.") + "\n")
-            print("==== SOURCES (retrieved) ====\n")
-            for i, d in enumerate(docs):
+            print("==== SOURCES (in prompt) ====\n")
+            for i, d in enumerate(context_docs):
                 print(f"[{i}] {d.get('source')}   (snippet: {d.get('text')})")
             print(f"\n(Generation time: {elapsed:.1f}s)\n")
 
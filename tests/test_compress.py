@@ -0,0 +1,120 @@
+# tests/test_compress.py
+import numpy as np
+
+from app.compress import compress_context, split_sentences, _keyword_scores
+
+
+class StubEncoder:
+    """Gives each sentence the score of the first keyword it contains (else 0)."""
+
+    def __init__(self, scores):
+        self.scores = scores
+
+    def encode(self, texts, convert_to_numpy=True):
+        # first row is the query; cosine with it equals the keyword score
+        rows = [[1.0, 0.0]]
+        for t in texts[1:]:
+            score = next((v for k, v in self.scores.items() if k in t), 0.0)
+            rows.append([score, float(np.sqrt(1.0 - score ** 2))])
+        return np.asarray(rows, dtype=np.float32)
+
+
+def test_budget_respected():
+    docs = [{"source": "a.txt", "text": "Alpha one. Alpha two. Alpha three. Alpha four."}]
+    out, stats = compress_context("Alpha", docs, keep_ratio=1.0, max_chars=25, neighbours=1, encoder=StubEncoder({"Alpha": 1.0}))
+    assert stats["compressed_chars"] <= 25
+    assert 0 < stats["ratio"] < 1
+
+
+def test_anchor_kept_with_neighbours():
+    docs = [{"source": "a.txt", "text": "First. Before. TOP sentence. After. Last."}]
+    out, _ = compress_context("TOP", docs, keep_ratio=1.0, max_chars=29, neighbours=1, encoder=StubEncoder({"TOP": 1.0}))
+    assert out == [{"source": "a.txt", "text": "Before. TOP sentence. After."}]
+
+
+def test_neighbours_not_kept_without_anchor():
+    pad_a = "Padding sentence number one is here ok."
+    pad_b = "Padding sentence number two is here ok."
+    top = "TOP " + "x" * 700 + "."
+    docs = [
+        {"source": "a.txt", "text": f"{pad_a} {top} {pad_b}"},
+        {"source": "b.txt", "text": "Second best KEY sentence."},
+    ]
+    enc = StubEncoder({"TOP": 1.0, "KEY": 0.9})
+    out, _ = compress_context("q", docs, keep_ratio=1.0, max_chars=85, neighbours=1, encoder=enc)
+    # the over-budget anchor must not pull in its neighbours ahead of the next-best sentence
+    assert {"source": "b.txt", "text": "Second best KEY sentence."} in out
+    assert all("TOP" not in d["text"] for d in out)
+
+
+def test_docs_without_selected_sentences_dropped():
+    docs = [
+        {"source": "hit.txt", "text": "Reset your password here."},
+        {"source": "miss.txt", "text": "Unrelated billing information that is fairly long."},
+    ]
+    out, stats = compress_context("password", docs, keep_ratio=1.0, max_chars=30, neighbours=0, encoder=StubEncoder({"password": 1.0}))
+    assert [d["source"] for d in out] == ["hit.txt"]
+    assert stats["sentences_kept"] == 1
+
+
+def test_no_sentences_stats_consistent():
+    docs = [{"source": "a.txt", "text": "", "raw": "", "norm": ""}]
+    out, stats = compress_context("anything", docs, encoder=StubEncoder({}))
+    assert out == [{"source": "a.txt", "text": ""}]
+    assert stats["compressed_chars"] == stats["original_chars"]
+    assert stats["ratio"] == 1.0
+
+
+def test_keep_ratio_binds_on_short_passages():
+    docs = [
+        {"source": "a.txt", "text": "Reset your password in Settings."},
+        {"source": "b.txt", "text": "Supported browsers are Chrome and Firefox."},
+    ]
+    out, stats = compress_context("password", docs, keep_ratio=0.5, encoder=StubEncoder({"password": 1.0}))
+    assert out == [{"source": "a.txt", "text": "Reset your password in Settings."}]
+    assert stats["ratio"] < 1
+
+
+def test_query_emb_is_used_instead_of_encoding_query():
+    class SentenceOnlyEncoder(StubEncoder):
+        def encode(self, texts, convert_to_numpy=True):
+            assert "the query" not in texts
+            return super().encode(["<query>"] + list(texts))[1:]
+
+    docs = [{"source": "a.txt", "text": "Other thing. The KEY fact."}]
+    out, _ = compress_context(
+        "the query", docs, keep_ratio=0.6, neighbours=0,
+        encoder=SentenceOnlyEncoder({"KEY": 1.0}), query_emb=np.array([1.0, 0.0]),
+    )
+    assert out == [{"source": "a.txt", "text": "The KEY fact."}]
+
+
+def test_empty_doc_kept_for_prompt():
+    docs = [
+        {"source": "a.txt", "text": "Reset your password here."},
+        {"source": "empty.txt", "text": ""},
+    ]
+    out, _ = compress_context("password", docs, keep_ratio=1.0, encoder=StubEncoder({"password": 1.0}))
+    assert {"source": "empty.txt", "text": ""} in out
+
+
+def test_best_sentence_kept_when_it_alone_exceeds_budget():
+    docs = [{"source": "a.txt", "text": "The only KEY sentence is rather long."}]
+    out, stats = compress_context("q", docs, max_chars=5, encoder=StubEncoder({"KEY": 1.0}))
+    assert out == [{"source": "a.txt", "text": "The only KEY sentence is rather long."}]
+    assert stats["sentences_kept"] == 1
+
+
+def test_split_sentences():
+    text = "First line.\nSecond?  Third!   Go to Settings -> Account"
+    assert split_sentences(text) == ["First line.", "Second?", "Third!", "Go to Settings -> Account"]
+    assert split_sentences("") == []
+    assert split_sentences(None) == []
+
+
+def test_keyword_scores():
+    scores = _keyword_scores("How do I reset my password?", ["Reset the password.", "Billing info.", "a b"])
+    assert scores[0] > 0
+    assert scores[1] == 0
+    assert scores[2] == 0
+    assert np.all(_keyword_scores("?", ["Reset the password."]) == 0)